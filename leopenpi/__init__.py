@@ -1,2 +1,2 @@
-from .utils import Camera, EnvironmentConfiguration, RobotConfiguration, Joint, TeleopConfiguration, LoggingSubscriber, RobotWrapper, VideoHandler
+from .utils import Camera, EnvironmentConfiguration, RobotConfiguration, Joint, TeleopConfiguration, config_to_dict, dumps_config_json, write_config_atomic, load_config_file, config_sidecar_path, write_config_sidecar, parse_config, SafeDumper, SafeLoader, LoggingSubscriber, LoopTimer, RobotWrapper, VideoHandler
 from .robot_environment import RobotEnvironment
\ No newline at end of file
@@ -1,47 +1,63 @@
-from draccus import parse
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from openpi_client.action_chunk_broker import ActionChunkBroker
 from openpi_client.runtime.agents.policy_agent import PolicyAgent
 from openpi_client.runtime.runtime import Runtime
 from openpi_client.websocket_client_policy import WebsocketClientPolicy
 from leopenpi.mocks import TeleopPolicy
-from leopenpi.utils import EnvironmentConfiguration, LoggingSubscriber, RobotWrapper
+from leopenpi.utils import EnvironmentConfiguration, LoggingSubscriber, RobotWrapper, parse_config
 from leopenpi.robot_environment import RobotEnvironment
 
-def main(config: EnvironmentConfiguration):
-    robot = RobotWrapper(config.robot, config.logger)
-    robot.connect()
-
-    if config.start_home:
-        home_action = {}
-        for joint in config.robot.joints:
-            if joint.home is not None:
-                home_action[f'{joint.name}.pos'] = joint.home
-            else:
-                break
-        else:
-            # Only send the action if all joints have a home
-            robot.robot.send_action(home_action)
-
-    environment = RobotEnvironment(config.prompt, robot, config.cameras)
-    if config.policy_type == "openpi":
-        if config.server_ip == None:
-            raise Exception("IP address is required for openpi. Set `server_ip: x.x.x.x` in your config file.")
-        policy = WebsocketClientPolicy(host=config.server_ip, port=config.server_port)
-        policy = ActionChunkBroker(policy, action_horizon=10)
-    elif config.policy_type == "teleop":
-        policy = TeleopPolicy(config.teleop, config.robot)
-    else:
-        raise Exception("Unrecognized policy type: ", config.policy_type)
-
-    agent = PolicyAgent(policy)
-    runtime = Runtime(environment, agent, [LoggingSubscriber(config.logger)])
 
+def _start_log_listener() -> QueueListener:
+    """Route log records through a queue so console output is written on a listener thread, not the control loop."""
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+    listener = QueueListener(log_queue, console, respect_handler_level=True)
+    logging.getLogger().addHandler(QueueHandler(log_queue))
+    listener.start()
+    return listener
+
+
+def main(config: EnvironmentConfiguration):
+    log_listener = _start_log_listener()
     try:
-        runtime.run()
+        robot = RobotWrapper(config.robot, config.logger)
+        robot.connect()
+
+        # Only send the action if all joints have a home
+        if config.start_home and config.robot.home_action:
+            robot.robot.send_action(config.robot.home_action)
+
+        environment = RobotEnvironment(config.prompt, robot, config.cameras, observation_delay=config.observation_delay)
+        if config.policy_type == "openpi":
+            if config.server_ip == None:
+                raise Exception("IP address is required for openpi. Set `server_ip: x.x.x.x` in your config file.")
+            policy = WebsocketClientPolicy(host=config.server_ip, port=config.server_port)
+            policy = ActionChunkBroker(policy, action_horizon=10)
+        elif config.policy_type == "teleop":
+            # Share the follower connection with the environment rather than opening the port twice
+            policy = TeleopPolicy(config.teleop, config.robot, robot_handle=robot.robot)
+        else:
+            raise Exception("Unrecognized policy type: ", config.policy_type)
+
+        agent = PolicyAgent(policy)
+        runtime = Runtime(environment, agent, [LoggingSubscriber(config.logger)])
+
+        try:
+            runtime.run()
+        finally:
+            if isinstance(policy, TeleopPolicy):
+                policy.close()
+            environment.close()
+            robot.disconnect()
     finally:
-        robot.disconnect()
+        # Flushes the records still queued
+        log_listener.stop()
 
 
 if __name__ == "__main__":
-    main(parse(EnvironmentConfiguration))
\ No newline at end of file
+    main(parse_config(EnvironmentConfiguration))
\ No newline at end of file
@@ -1,3 +1,4 @@
+import atexit
 from typing import Dict
 
 import numpy as np
@@ -17,33 +18,49 @@ class TeleopPolicy(_base_policy.BasePolicy):
     for the robot, bypassing the need for a remote policy server.
     """
 
-    def __init__(self, teleop: TeleopConfiguration, robot: RobotConfiguration):
+    def __init__(self, teleop: TeleopConfiguration, robot: RobotConfiguration, robot_handle=None):
+        """
+        Args:
+            teleop: Teleoperator (leader arm) configuration
+            robot: Robot (follower arm) configuration
+            robot_handle: An already connected follower driver to read from, e.g. `RobotWrapper.robot`.
+                          If None, the policy opens its own connection to the follower.
+        """
         teleop_config = SO101LeaderConfig(
             port=teleop.port,
             id=teleop.id
         )
-        robot_config = SO101FollowerConfig(
-            port=robot.port,
-            id=robot.id
-        )
         self.teleop = make_teleoperator_from_config(teleop_config)
-        self.robot = make_robot_from_config(robot_config)
+        # Only a follower connection opened here is disconnected by close()
+        self._owns_robot = robot_handle is None
+        if robot_handle is None:
+            robot_config = SO101FollowerConfig(
+                port=robot.port,
+                id=robot.id
+            )
+            robot_handle = make_robot_from_config(robot_config)
+        self.robot = robot_handle
         self.robot_config = robot
+        # Observation keys and per-joint scale, built once instead of on every inference
+        self._keys = tuple(f"{joint.name}.pos" for joint in robot.all_joints)
+        # Offset the motion reduction that we do for openpi
+        self._scale = np.array([20 / (joint.max_limit - joint.min_limit) for joint in robot.all_joints],
+                               dtype=np.float32)
         self.teleop.connect()
-        self.robot.connect()
+        if not self.robot.is_connected:
+            self.robot.connect()
+        # Safety net in case the owner never calls close()
+        atexit.register(self.close)
 
     @override
     def infer(self, obs: Dict) -> Dict:
         """Get action from the teleoperator device."""
         telop_pos = self.teleop.get_action()
         robot_pos = self.robot.get_observation()
-        delta = np.zeros(shape=(6,), dtype=np.float32)
-        for i, joint in enumerate(self.robot_config.all_joints):
-            joint_name = f"{joint.name}.pos"
-            diff = telop_pos[joint_name] - robot_pos[joint_name]
-            joint_range = joint.max_limit - joint.min_limit
-            # Offset the motion reduction that we do for openpi
-            delta[i] = 20 * diff / joint_range
+        count = len(self._keys)
+        telop_arr = np.fromiter((telop_pos[key] for key in self._keys), dtype=np.float32, count=count)
+        robot_arr = np.fromiter((robot_pos[key] for key in self._keys), dtype=np.float32, count=count)
+        delta = (telop_arr - robot_arr) * self._scale
 
         return {
             "actions": delta
@@ -55,7 +72,16 @@ class TeleopPolicy(_base_policy.BasePolicy):
         # TODO
         pass
 
+    def close(self) -> None:
+        """Disconnect the teleoperator, and the follower if this policy connected it. Safe to call twice."""
+        atexit.unregister(self.close)
+        if self.teleop.is_connected:
+            self.teleop.disconnect()
+        if self._owns_robot and self.robot.is_connected:
+            self.robot.disconnect()
+
+    def __enter__(self):
+        return self
 
-    def __del__(self):
-        """Ensure cleanup happens when object is garbage collected."""
-        self.teleop.disconnect()
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -1,3 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from openpi_client.runtime.environment import Environment
 from leopenpi import Camera
 from leopenpi.utils.robot_wrapper import RobotWrapper
@@ -5,31 +8,98 @@ from leopenpi.utils.video_handler import VideoHandler
 
 
 class RobotEnvironment(Environment):
-    def __init__(self, prompt: str, robot: RobotWrapper, cameras: list[Camera]):
+    def __init__(self, prompt: str, robot: RobotWrapper, cameras: list[Camera], observation_delay: int = 0):
         self.robot = robot
-        self._video_handlers = {camera.name: VideoHandler(camera=camera) for camera in cameras}
+        # Camera reads are I/O bound, so capture them concurrently rather than one after another.
+        # The pool is shared with the video handlers so no threads are created per capture.
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(cameras)), thread_name_prefix="cam")
+        # Opening a camera includes a warm-up wait, so the cameras are opened in parallel on the pool
+        handlers = self._pool.map(lambda camera: VideoHandler(camera=camera, executor=self._pool), cameras)
+        self._video_handlers = {camera.name: handler for camera, handler in zip(cameras, handlers)}
+        # (observation key, handler) pairs, so the keys aren't formatted on every step
+        self._camera_keys = tuple((f"observation/{name}", handler) for name, handler in self._video_handlers.items())
         self._prompt = prompt
+        # Captures for the next observation, started as soon as the previous action has been sent
+        self._capture_futures = None
+
+        # Observation buffers, including the camera frames owned by each VideoHandler, are reused
+        # across steps to avoid per-step allocations and copies. Camera frames are double-buffered,
+        # so prefetching the next capture doesn't overwrite the frames of the current step.
+        # Consumers that need to keep an observation past the current step must copy it.
+        # Joints and gripper are read together into one buffer; state and gripper are views into it.
+        self._positions_buf = np.empty(len(robot.config.all_joints), dtype=np.float32)
+        self._state_buf = self._positions_buf[:-1]
+        self._gripper_buf = self._positions_buf[-1:]
+        self._obs = {
+            "prompt": self._prompt,
+            "observation/gripper_position": self._gripper_buf,
+            "observation/state": self._state_buf,
+        }
+        # Ring of the last `observation_delay + 1` observations. Each array observation gets one
+        # preallocated (observation_delay + 1, *shape) array, allocated on the first observation.
+        self._delay_len = observation_delay + 1
+        self._delay_ring = None
+        self._delay_next = 0
+        self._delay_count = 0
+        self._delayed_obs = {}
 
     @property
     def prompt(self):
         return self._prompt
 
     def reset(self) -> None:
-        return
+        self._delay_next = 0
+        self._delay_count = 0
 
     def is_episode_complete(self) -> bool:
         # TODO: Implement logic for concluding episode
         return False
 
     def get_observation(self) -> dict:
-        return {
-            "prompt": self.prompt,
-            "observation/gripper_position": self.robot.get_gripper_observation(),
-            "observation/state": self.robot.get_joint_observation(),
-            **{f"observation/{name}": handler.capture_frame() for name, handler in self._video_handlers.items()},
-        }
+        # Start the camera captures (unless already prefetched) so they overlap with the robot reads
+        futures = self._capture_futures or self._start_capture()
+        self._capture_futures = None
+        self.robot.get_all_joint_observation(out=self._positions_buf)
+        for key, future in futures.items():
+            self._obs[key] = future.result()
+
+        if self._delay_len == 1:
+            return self._obs
+        return self._delay_observation()
 
     def apply_action(self, action: dict) -> None:
         # Only take the first 6 values
         act = action["actions"][:6]
         self.robot.apply_action(act)
+        # Prefetch the frames for the next observation while the rest of the step runs
+        self._capture_futures = self._start_capture()
+
+    def _delay_observation(self) -> dict:
+        """Store the live observation in the delay ring and return the oldest one held."""
+        if self._delay_ring is None:
+            self._delay_ring = {key: np.empty((self._delay_len, *value.shape), dtype=value.dtype)
+                                for key, value in self._obs.items() if isinstance(value, np.ndarray)}
+
+        # The live buffers are overwritten every step, so they are copied into the ring
+        slot = self._delay_next
+        for key, ring in self._delay_ring.items():
+            ring[slot] = self._obs[key]
+        self._delay_next = (slot + 1) % self._delay_len
+        self._delay_count = min(self._delay_count + 1, self._delay_len)
+
+        # Until the ring has filled up, the oldest observation is the first one since reset
+        oldest = (slot - self._delay_count + 1) % self._delay_len
+        self._delayed_obs.update(self._obs)
+        for key, ring in self._delay_ring.items():
+            self._delayed_obs[key] = ring[oldest]
+        return self._delayed_obs
+
+    def _start_capture(self) -> dict:
+        """Submit a frame capture for every camera and return the futures by observation key."""
+        return {key: handler.capture_frame_async() for key, handler in self._camera_keys}
+
+    def close(self) -> None:
+        """Shut down the camera capture threads and release the cameras."""
+        self._pool.shutdown(wait=True)
+        for handler in self._video_handlers.values():
+            handler.release()
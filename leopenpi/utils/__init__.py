@@ -1,4 +1,5 @@
-from .configurations import Camera, EnvironmentConfiguration, RobotConfiguration, Joint, TeleopConfiguration
+from .configurations import Camera, EnvironmentConfiguration, RobotConfiguration, Joint, TeleopConfiguration, config_to_dict, dumps_config_json, write_config_atomic, load_config_file, config_sidecar_path, write_config_sidecar, parse_config, SafeDumper, SafeLoader
 from .logging_subscriber import LoggingSubscriber
+from .loop_timer import LoopTimer
 from .robot_wrapper import RobotWrapper
 from .video_handler import VideoHandler
\ No newline at end of file
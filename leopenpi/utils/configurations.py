@@ -1,5 +1,24 @@
-from dataclasses import dataclass
-from logging import Logger
+import copy
+import hashlib
+import json
+import os
+import pickle
+import sys
+from dataclasses import dataclass, fields, is_dataclass
+from functools import cached_property
+from logging import Logger, getLogger
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
 
 
 @dataclass
@@ -20,6 +39,18 @@ class Camera:
     maxY: int = None
 
 
+# Default joints for SO-101 robot with 6 motors in order, as (name, min_limit, max_limit).
+# Motor names match LeRobot SO101Follower configuration
+_DEFAULT_JOINTS = (
+    ('shoulder_pan', -1.0, 1.0),
+    ('shoulder_lift', -1.0, 1.0),
+    ('elbow_flex', -1.0, 1.0),
+    ('wrist_flex', -1.0, 1.0),
+    ('wrist_roll', -1.0, 1.0),
+)
+_DEFAULT_GRIPPER = ('gripper', -1.0, 1.0)
+
+
 @dataclass
 class RobotConfiguration:
     port: str
@@ -29,20 +60,20 @@ class RobotConfiguration:
     all_joints: list[Joint] = None
 
     def __post_init__(self):
+        # Joints are mutable (calibration updates their limits), so each configuration gets its own
         if self.joints is None:
-            # Default joints for SO-101 robot with 6 motors in order
-            # Motor names match LeRobot SO101Follower configuration
-            object.__setattr__(self, 'joints', [
-                Joint('shoulder_pan', -1.0, 1.0),
-                Joint('shoulder_lift', -1.0, 1.0),
-                Joint('elbow_flex', -1.0, 1.0),
-                Joint('wrist_flex', -1.0, 1.0),
-                Joint('wrist_roll', -1.0, 1.0),
-            ])
+            self.joints = [Joint(*joint) for joint in _DEFAULT_JOINTS]
         if self.gripper is None:
-            object.__setattr__(self, 'gripper', Joint('gripper', -1.0, 1.0))
+            self.gripper = Joint(*_DEFAULT_GRIPPER)
         self.all_joints = self.joints + [self.gripper]
 
+    @cached_property
+    def home_action(self) -> dict[str, float] | None:
+        """Action that moves the joints to their home positions, or None if any joint has no home."""
+        if any(joint.home is None for joint in self.joints):
+            return None
+        return {f'{joint.name}.pos': joint.home for joint in self.joints}
+
 @dataclass(frozen=True)
 class TeleopConfiguration:
     port: str
@@ -59,9 +90,182 @@ class EnvironmentConfiguration:
     policy_type: str = "openpi"
     server_port: int = 8000
     max_steps: int = 1000
+    # Number of steps by which observations are delayed, to match the latency a policy was trained with
+    observation_delay: int = 0
     log_level: str = "INFO"
     logger: Logger = None
 
     def __post_init__(self):
         if self.logger is None:
-            object.__setattr__(self, 'logger', Logger(__name__, self.log_level))
+            # The module logger is shared through the logging manager instead of creating one per configuration
+            self.logger = getLogger(__name__)
+            self.logger.setLevel(self.log_level)
+
+
+# Runtime-only fields that are not written to configuration files
+_UNSERIALIZED_FIELDS = frozenset({'logger', 'all_joints'})
+
+
+def config_to_dict(obj):
+    """Convert a configuration dataclass to plain dicts and lists for YAML/JSON serialization."""
+    if is_dataclass(obj):
+        return {f.name: config_to_dict(getattr(obj, f.name)) for f in fields(obj) if f.name not in _UNSERIALIZED_FIELDS}
+    if isinstance(obj, list):
+        return [config_to_dict(item) for item in obj]
+    return obj
+
+
+def dumps_config_json(obj) -> str:
+    """Serialize a `config_to_dict` result as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def write_config_atomic(path: str, config_data: dict) -> None:
+    """Write `config_data` to a YAML or JSON config file, picked by the extension of `path`.
+
+    The data is written and fsynced to a temporary sibling that then replaces `path`, so an
+    interrupted write leaves the previous file intact instead of a truncated config.
+    """
+    path = os.fspath(path)
+    if path.lower().endswith('.json'):
+        text = dumps_config_json(config_data)
+    elif path.lower().endswith(('.yaml', '.yml')):
+        text = yaml.dump(config_data, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+    else:
+        raise ValueError("Config file must be YAML or JSON.")
+
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def config_sidecar_path(path: str) -> str:
+    """Path of the JSON copy written next to a YAML config, e.g. `config.yaml.json`."""
+    return path + '.json'
+
+
+def _config_digest(raw: bytes) -> str:
+    return hashlib.sha1(raw).hexdigest()
+
+
+def write_config_sidecar(path: str, config_data: dict) -> None:
+    """Write the JSON sidecar for the YAML config at `path`, which must already hold `config_data`.
+
+    The sidecar records a hash of the YAML it was made from, and is only used while the YAML
+    still has exactly that content.
+    """
+    with open(path, 'rb') as f:
+        digest = _config_digest(f.read())
+    write_config_atomic(config_sidecar_path(path), {'source_sha1': digest, 'config': config_data})
+
+
+def load_config_file(path: str) -> dict:
+    """Load a YAML or JSON config file as plain dicts.
+
+    A YAML file's JSON sidecar (see `write_config_sidecar`) is read instead when it was written
+    from the YAML's current content, since JSON parses much faster.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if path.lower().endswith('.json'):
+        return json.loads(raw)
+
+    if path.lower().endswith(('.yaml', '.yml')):
+        try:
+            with open(config_sidecar_path(path), 'rb') as f:
+                sidecar = json.load(f)
+            if sidecar['source_sha1'] == _config_digest(raw):
+                return sidecar['config']
+        except (OSError, ValueError, TypeError, KeyError):
+            pass  # Missing, unreadable or stale sidecar; parse the YAML itself
+    return yaml.load(raw, Loader=SafeLoader)
+
+
+def _parse_cache_version() -> str:
+    """Hash of this module's source, so pickles written with other dataclass definitions are ignored."""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _parse_cache_dir() -> str:
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'leopenpi')
+
+
+def _config_path_from_args(args: list[str]) -> str | None:
+    """Find the value of draccus' `--config_path` in `args`."""
+    for i, arg in enumerate(args):
+        if arg.startswith('--config_path='):
+            return arg.split('=', 1)[1]
+        if arg == '--config_path' and i + 1 < len(args):
+            return args[i + 1]
+    return None
+
+
+def parse_config(cls=EnvironmentConfiguration, args: list[str] | None = None):
+    """Parse `cls` from the command line with draccus, reusing a pickled result from an earlier run.
+
+    There is one cache file per class, config file and command line, overwritten when the config
+    file changes. The cached result is used while the config file's mtime and size and the
+    source of this module are unchanged, which skips draccus' dataclass walk and the YAML parse
+    on repeated runs. The logger is not cached; it is recreated from `log_level` after loading.
+    """
+    from draccus import parse
+
+    args = sys.argv[1:] if args is None else list(args)
+    config_path = _config_path_from_args(args)
+    try:
+        stat = os.stat(config_path) if config_path else None
+    except OSError:
+        stat = None
+    name = (
+        f'{cls.__module__}.{cls.__qualname__}',
+        os.path.abspath(config_path) if config_path else None,
+        tuple(args),
+    )
+    key = (_parse_cache_version(), name, (stat.st_mtime_ns, stat.st_size) if stat else None)
+    cache_path = os.path.join(_parse_cache_dir(), f'config-{hashlib.sha1(repr(name).encode()).hexdigest()}.pkl')
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_key, config = pickle.load(f)
+        if cached_key == key:
+            if hasattr(config, '__post_init__'):
+                config.__post_init__()
+            return config
+    except (OSError, pickle.PickleError, EOFError, AttributeError) as e:
+        getLogger(__name__).debug("Config parse cache not used: %s", e)
+
+    config = parse(cls, args=args)
+
+    try:
+        cached = copy.copy(config)
+        if hasattr(cached, 'logger'):
+            cached.logger = None
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, cached), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    except (OSError, pickle.PickleError, AttributeError) as e:
+        # The cache is only an optimization
+        getLogger(__name__).debug("Config parse cache not written: %s", e)
+    return config
@@ -1,7 +1,18 @@
+import logging
 from logging import Logger
+
+import numpy as np
 from openpi_client.runtime.subscriber import Subscriber
 
 
+def _summarize(step_data: dict) -> dict:
+    """Replace large arrays (e.g. camera frames) with a short description so they are cheap to log."""
+    return {
+        key: f"<ndarray shape={value.shape} dtype={value.dtype}>" if isinstance(value, np.ndarray) and value.ndim > 1 else value
+        for key, value in step_data.items()
+    }
+
+
 class LoggingSubscriber(Subscriber):
     def __init__(self, logger: Logger):
         self.logger = logger
@@ -10,8 +21,11 @@ class LoggingSubscriber(Subscriber):
         self.logger.info("Episode started")
 
     def on_step(self, observation: dict, action: dict) -> None:
-        self.logger.debug(f"Observation: {observation}")
-        self.logger.debug(f"Action: {action}")
+        # Building the step summaries is only worth it when they will actually be emitted
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self.logger.debug("Observation: %s", _summarize(observation))
+        self.logger.debug("Action: %s", _summarize(action))
 
     def on_episode_end(self) -> None:
-        self.logger.info("Episode ended")
\ No newline at end of file
+        self.logger.info("Episode ended")
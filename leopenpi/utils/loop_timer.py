@@ -0,0 +1,53 @@
+import time
+
+
+class LoopTimer:
+    """
+    Keeps a loop at a fixed rate by sleeping until absolute deadlines.
+
+    Unlike sleeping a fixed period after each iteration, the time spent doing work
+    is absorbed into the period, so the loop doesn't drift below its target rate.
+    """
+
+    def __init__(self, hz: float, spin_time: float = 0.0):
+        """
+        Initialize LoopTimer.
+
+        Args:
+            hz: Target loop rate
+            spin_time: The final part of each wait, in seconds, that is busy-waited
+                       instead of slept. By default the whole wait is one sleep, which is
+                       accurate to well under a millisecond on Linux; spinning trades a
+                       core's worth of CPU for tighter deadlines.
+        """
+        self.period = 1.0 / hz
+        self.spin_time = spin_time
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new period from now, e.g. after a pause or error."""
+        self._next_tick = time.perf_counter() + self.period
+
+    def sleep(self) -> float:
+        """
+        Wait until the end of the current period.
+
+        Returns:
+            How late the loop is in seconds, or 0 if the deadline was met
+        """
+        deadline = self._next_tick
+        self._next_tick += self.period
+
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            if remaining > self.spin_time:
+                time.sleep(remaining - self.spin_time)
+            if self.spin_time:
+                while time.perf_counter() < deadline:
+                    pass
+            return 0.0
+
+        # Resynchronize after overrunning a whole period instead of bursting to catch up
+        if -remaining > self.period:
+            self.reset()
+        return -remaining
@@ -1,11 +1,15 @@
+import sys
+from operator import itemgetter
 import numpy as np
 import logging
 from .configurations import RobotConfiguration, Joint
-from lerobot.robots.so101_follower import SO101Follower
-from lerobot.robots.so101_follower.config_so101_follower import SO101FollowerConfig
 
 class RobotWrapper:
     def __init__(self, config: RobotConfiguration, logger: logging.Logger = logging.Logger(__name__)):
+        # Imported here so that importing leopenpi (e.g. for config tooling) doesn't load lerobot
+        from lerobot.robots.so101_follower import SO101Follower
+        from lerobot.robots.so101_follower.config_so101_follower import SO101FollowerConfig
+
         self.config = config
         self.logger = logger
         robot_config = SO101FollowerConfig(port=self.config.port, id=self.config.id)
@@ -13,6 +17,37 @@ class RobotWrapper:
         self.robot = SO101Follower(robot_config)
         self.is_connected = False
 
+        # Observation/action keys are built once rather than on every control step
+        self._joint_keys = self._keys_for(self.config.joints)
+        self._gripper_keys = self._keys_for([self.config.gripper])
+        self._all_joint_keys = self._keys_for(self.config.all_joints)
+        # Gather the values for each key group from an observation dict in a single C call
+        self._joint_getter = self._getter_for(self._joint_keys)
+        self._gripper_getter = self._getter_for(self._gripper_keys)
+        self._all_joint_getter = self._getter_for(self._all_joint_keys)
+        # Joint limits as arrays (in all_joints order) so actions are clipped in one call
+        self._min_limits = np.array([joint.min_limit for joint in self.config.all_joints], dtype=np.float32)
+        self._max_limits = np.array([joint.max_limit for joint in self.config.all_joints], dtype=np.float32)
+        # Per-joint scale from a [-1, 1] action to a position delta (2.5% of the joint's range)
+        self._action_gain = (self._max_limits - self._min_limits) * np.float32(0.025)
+        # Joints that were clipped on the previous action. Clipping is only logged when it starts,
+        # since a policy pushing against a limit would otherwise log on every step.
+        self._clipping = np.zeros(len(self.config.all_joints), dtype=bool)
+        # Motor command dict, updated in place on every action. send_action reads it without keeping it.
+        self._goal_positions = dict.fromkeys(self._all_joint_keys, 0.0)
+
+    @staticmethod
+    def _keys_for(joints: list[Joint]) -> tuple[str, ...]:
+        return tuple(sys.intern(f"{joint.name}.pos") for joint in joints)
+
+    @staticmethod
+    def _getter_for(keys: tuple[str, ...]):
+        getter = itemgetter(*keys)
+        if len(keys) == 1:
+            # itemgetter with a single key returns the bare value rather than a tuple
+            return lambda obs: (getter(obs),)
+        return getter
+
     def connect(self, calibrate: bool = True) -> None:
         """Connect to the robot hardware."""
         if self.is_connected:
@@ -24,36 +59,46 @@ class RobotWrapper:
         self.logger.info("Successfully connected to SO101 robot")
 
 
-    def _get_observation(self, joints: list[Joint]):
-        """Get the current joint observation from the robot."""
+    def _get_observation(self, getter, out: np.ndarray | None = None):
+        """Get the current joint observation from the robot, using a getter from `_getter_for`.
+
+        If `out` is given, the values are written into it in place and it is returned.
+        """
         if not self.is_connected:
             raise RuntimeError("Robot not connected")
 
         obs = self.robot.get_observation()
-        processed_obs = np.zeros(shape=(len(joints),), dtype=np.float32)
-        # Capture order from config
-        for i, joint in enumerate(joints):
-            joint_name = f"{joint.name}.pos"
-            if joint_name not in obs:
-                raise ValueError(f"Could not find {joint_name} in robot observation from config value `{joint}`")
-            processed_obs[i] = obs[joint_name]
-        return processed_obs
-
-    def get_joint_observation(self) -> np.ndarray:
+        try:
+            values = getter(obs)
+        except KeyError as e:
+            raise ValueError(f"Could not find {e.args[0]} in robot observation") from None
+        if out is None:
+            return np.array(values, dtype=np.float32)
+        out[:] = values
+        return out
+
+    def get_joint_observation(self, out: np.ndarray | None = None) -> np.ndarray:
         """Get the current joint observation from the robot."""
-        return self._get_observation(self.config.joints)
+        return self._get_observation(self._joint_getter, out=out)
 
-    def get_gripper_observation(self) -> np.ndarray:
+    def get_gripper_observation(self, out: np.ndarray | None = None) -> np.ndarray:
         """Get the current gripper observation from the robot."""
-        return self._get_observation([self.config.gripper])
+        return self._get_observation(self._gripper_getter, out=out)
+
+    def get_all_joint_observation(self, out: np.ndarray | None = None) -> np.ndarray:
+        """Get the joint observation followed by the gripper observation from a single robot read."""
+        return self._get_observation(self._all_joint_getter, out=out)
 
-    def apply_action(self, action: np.ndarray) -> None:
+    def apply_action(self, action: np.ndarray, current_positions: np.ndarray | None = None) -> None:
         """Execute an action from the environment.
 
         Args:
             action: A numpy array of shape (6,) with values in range [-1, 1]
                    representing the delta movement for each of the 6 motors.
                    Each value represents how much to move from current position.
+            current_positions: Positions of all joints (as from get_all_joint_observation) to move from.
+                   Pass these when they were just read to skip a second robot read. If None,
+                   the positions are read from the robot.
         """
         if not isinstance(action, np.ndarray):
             raise ValueError("Action must be a numpy array")
@@ -65,33 +110,38 @@ class RobotWrapper:
             self.logger.warning("Robot not connected, skipping action")
             return
 
-        current_positions = self._get_observation(self.config.all_joints)
-
-        goal_positions = {}
-        for i, joint in enumerate(self.config.all_joints):
-            current_pos = current_positions[i]
-            action_val = action[i]
-
-            total_range = joint.max_limit - joint.min_limit
-            delta_movement = action_val * total_range * 0.025
-            new_position = current_pos + delta_movement
-            clipped_value = np.clip(new_position, joint.min_limit, joint.max_limit)
-
-            if clipped_value != new_position:
-                print(
-                    f"Clipping on {joint.name}: "
-                    f"requested={new_position:.4f}, "
-                    f"clipped={clipped_value:.4f}, "
-                    f"min={joint.min_limit:.4f}, "
-                    f"max={joint.max_limit:.4f}"
-                )
-            goal_positions[f"{joint.name}.pos"] = float(clipped_value)
+        if current_positions is None:
+            current_positions = self._get_observation(self._all_joint_getter)
+        goal_positions = self._compute_goal(action, current_positions)
 
         try:
             self.robot.send_action(goal_positions)
-            self.logger.debug(f"Sent action: {goal_positions}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Sent action: %s", goal_positions)
         except Exception as e:
-            self.logger.error(f"Failed to send motor commands: {e}")
+            self.logger.error("Failed to send motor commands: %s", e)
+
+    def _compute_goal(self, action: np.ndarray, current_positions: np.ndarray) -> dict[str, float]:
+        """Turn an action into clipped goal positions. The returned dict is reused by the next call."""
+        new_positions = current_positions + action * self._action_gain
+        clipped_positions = np.clip(new_positions, self._min_limits, self._max_limits)
+
+        clipping = clipped_positions != new_positions
+        # Only joints that started clipping on this action are reported; usually there are none
+        started = clipping & ~self._clipping
+        if started.any():
+            for i in np.flatnonzero(started):
+                joint = self.config.all_joints[i]
+                self.logger.warning(
+                    "Clipping on %s: requested=%.4f, clipped=%.4f, min=%.4f, max=%.4f",
+                    joint.name, new_positions[i], clipped_positions[i], joint.min_limit, joint.max_limit
+                )
+        self._clipping = clipping
+
+        # tolist() converts every position to a Python float in one call
+        goal_positions = self._goal_positions
+        goal_positions.update(zip(self._all_joint_keys, clipped_positions.tolist()))
+        return goal_positions
 
     def disconnect(self) -> None:
         """Disconnect from the robot hardware."""
@@ -1,8 +1,12 @@
 import time
+from concurrent.futures import Executor, Future
 import cv2
 import numpy as np
 import os
-from openpi_client.image_tools import convert_to_uint8, resize_with_pad
+import queue
+import sys
+import threading
+from openpi_client.image_tools import convert_to_uint8
 
 from .configurations import Camera
 
@@ -12,7 +16,8 @@ class VideoHandler:
     Handles video capture operations for a robot environment.
     """
 
-    def __init__(self, camera: Camera, image_height: int = 224, image_width: int = 224, debug: bool = False):
+    def __init__(self, camera: Camera, image_height: int = 224, image_width: int = 224, debug: bool = False,
+                 executor: Executor | None = None):
         """
         Initialize VideoHandler.
 
@@ -21,7 +26,9 @@ class VideoHandler:
             image_height: Target height for resized images
             image_width: Target width for resized images
             debug: Whether to save debug images
+            executor: Executor used by capture_frame_async. If None, captures run synchronously.
         """
+        self.executor = executor
         self.camera_index = camera.index
         self.image_height = image_height
         self.image_width = image_width
@@ -33,47 +40,191 @@ class VideoHandler:
         self.minY = camera.minY if self.crop_enabled else None
         self.maxY = camera.maxY if self.crop_enabled else None
 
-        self.cap = cv2.VideoCapture(self.camera_index)
+        if sys.platform.startswith('linux'):
+            # Use V4L2 directly and request MJPG, which needs far less USB bandwidth than raw YUYV.
+            # The resolution is left alone since crop coordinates are in the camera's native pixels.
+            self.cap = cv2.VideoCapture(self.camera_index, cv2.CAP_V4L2)
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        else:
+            self.cap = cv2.VideoCapture(self.camera_index)
         if not self.cap.isOpened():
             raise RuntimeError(f"Cannot open camera {self.camera_index}")
-        time.sleep(0.5)
-        # Capture and discard a few frames to ensure camera is ready
-        for _ in range(3):
-            self.cap.read()
+        # Keep only the newest frame queued so observations are at most one frame old.
+        # Not every backend honours this, in which case stale frames are drained on capture.
+        self.buffer_limited = self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._wait_until_ready()
+
+        # Reusable frame buffer, sized by OpenCV on the first capture
+        self._raw_frame = None
+        # Two output buffers used in turn, so a frame returned by capture_frame stays valid while the next
+        # one is captured (e.g. prefetched on the executor). Callers must copy a frame to keep it any longer.
+        # The outputs' padding is zeroed once here and never written again.
+        self._outputs = [np.zeros((3, self.image_height, self.image_width), dtype=np.uint8) for _ in range(2)]
+        self._output_index = 0
+        # Resize geometry for the (cropped) source size, computed on the first capture. See _resize_with_pad.
+        self._source_size = None
+        self._resized_frame = None
+        self._output_inners = None
 
         self.debug = debug
+        self._debug_queue = None
         if self.debug:
             os.makedirs("debug", exist_ok=True)
+            # Debug images are encoded on a background thread. At most two frames wait to be written;
+            # further frames are dropped rather than stalling the capture.
+            self._debug_queue = queue.Queue(maxsize=2)
+            threading.Thread(target=self._debug_writer, daemon=True, name=f"cam{self.camera_index}-debug").start()
+
+    def _wait_until_ready(self, max_reads: int = 30, min_brightness: float = 8.0) -> None:
+        """
+        Read and discard frames until the camera delivers a frame that isn't black.
+
+        Cameras often return black or partially exposed frames right after opening. Waiting for
+        actual image content avoids a fixed sleep; a scene that stays dark gives up after max_reads.
+
+        Args:
+            max_reads: Maximum number of frames to read
+            min_brightness: Mean pixel value above which a frame counts as ready
+        """
+        frame = None
+        for _ in range(max_reads):
+            ret, frame = self.cap.read(frame)
+            if ret and frame.mean() > min_brightness:
+                return
+            if not ret:
+                frame = None
+                time.sleep(0.01)
 
     def capture_frame(self) -> np.ndarray:
         """
         Capture a single frame on demand.
 
         Returns:
-            Single numpy array frame in (C, H, W) format
+            Single numpy array frame in (C, H, W) format. The array is reused by the call after next.
         """
-        ret, frame = self.cap.read()
+        ret, frame = self.cap.read(self._raw_frame) if self.buffer_limited else self._read_latest()
         if not ret:
             raise RuntimeError("Failed to capture frame for camera " + str(self.camera_index))
+        self._raw_frame = frame
 
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
+        # Crop and resize work on the unflipped BGR frame. The colour swap and the mirror happen in the
+        # final copy, so the resize is the only pass over the full-size frame.
+        if self.crop_enabled:
+            if self.flipped:
+                # The crop box is in flipped coordinates, so take the mirrored region of the raw frame
+                width = frame.shape[1]
+                frame = frame[self.minY:self.maxY, max(0, width - self.maxX):width - self.minX]
+            else:
+                frame = frame[self.minY:self.maxY, self.minX:self.maxX]
+
+        # Resize, then write (H, W, BGR) into the padded (C, H, W) RGB output in one copy
+        # OpenCV captures are already uint8, so the openpi conversion is only needed for other sources
+        img_array = frame if frame.dtype == np.uint8 else convert_to_uint8(frame)
+        img_array = self._resize_with_pad(img_array)
+        chw = np.transpose(img_array, (2, 0, 1))[::-1]
         if self.flipped:
-            frame_rgb = cv2.flip(frame_rgb, 1)
+            chw = chw[:, :, ::-1]
+        output_index = 1 - self._output_index
+        np.copyto(self._output_inners[output_index], chw, casting="unsafe")
+        # Publish the new frame only once it is complete
+        self._output_index = output_index
+        processed_frame = self._outputs[output_index]
 
-        if self.crop_enabled:
-            frame_rgb = frame_rgb[self.minY:self.maxY, self.minX:self.maxX]
+        if self.debug:
+            # Reversing the channel axis of the RGB output gives BGR for OpenCV without a colour conversion.
+            # The copy also keeps the image valid after the output buffer is reused.
+            debug_img = np.ascontiguousarray(np.transpose(processed_frame[::-1], (1, 2, 0)))
+            try:
+                self._debug_queue.put_nowait(debug_img)
+            except queue.Full:
+                pass
 
-        # Apply openpi-client transformations and convert to (C, H, W)
-        img_array = convert_to_uint8(frame_rgb)
-        img_array = resize_with_pad(img_array, self.image_height, self.image_width)
-        processed_frame = np.transpose(img_array, (2, 0, 1)).astype(np.uint8)
+        return processed_frame
 
-        if self.debug:
-            debug_path = f"debug/{self.camera_index}.jpg"
-            debug_img = np.transpose(processed_frame, (1, 2, 0))
-            debug_img = cv2.cvtColor(debug_img, cv2.COLOR_RGB2BGR)
+    def _resize_with_pad(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Resize a frame to fit the output size without distortion, like openpi_client's resize_with_pad.
+
+        Instead of resizing through PIL and pasting onto a new zero image, the frame is resized with
+        OpenCV into a reusable buffer, which capture_frame copies into the unpadded region of an output.
+
+        Args:
+            frame: Frame in (H, W, C) format
+
+        Returns:
+            The resized frame, sized to fit the unpadded region of the outputs
+        """
+        height, width = frame.shape[:2]
+        if self._source_size != (height, width):
+            # Same geometry as resize_with_pad: scale to fit, then centre with zero padding
+            ratio = max(width / self.image_width, height / self.image_height)
+            resized_height = int(height / ratio)
+            resized_width = int(width / ratio)
+            pad_height = max(0, int((self.image_height - resized_height) / 2))
+            pad_width = max(0, int((self.image_width - resized_width) / 2))
+            for output in self._outputs:
+                output.fill(0)
+            self._output_inners = [output[:, pad_height:pad_height + resized_height, pad_width:pad_width + resized_width]
+                                   for output in self._outputs]
+            self._resized_frame = None
+            self._source_size = (height, width)
+
+        resized_height, resized_width = self._output_inners[0].shape[1:]
+        if (height, width) == (resized_height, resized_width):
+            return frame
+        # INTER_AREA averages over the source pixels when shrinking, like PIL's antialiased bilinear resize
+        interpolation = cv2.INTER_AREA if resized_height < height else cv2.INTER_LINEAR
+        self._resized_frame = cv2.resize(frame, (resized_width, resized_height), dst=self._resized_frame,
+                                         interpolation=interpolation)
+        return self._resized_frame
+
+    def capture_frame_async(self) -> Future:
+        """
+        Capture a frame on the shared executor.
+
+        Returns:
+            Future resolving to the result of capture_frame
+        """
+        if self.executor is not None:
+            return self.executor.submit(self.capture_frame)
+
+        future = Future()
+        try:
+            future.set_result(self.capture_frame())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def release(self) -> None:
+        """Release the camera. The capture stays open for the handler's lifetime until this is called."""
+        self.cap.release()
+        if self._debug_queue is not None:
+            self._debug_queue.put(None)
+
+    def _debug_writer(self) -> None:
+        """Write queued debug images until release() queues None."""
+        debug_path = f"debug/{self.camera_index}.jpg"
+        while (debug_img := self._debug_queue.get()) is not None:
             cv2.imwrite(debug_path, debug_img)
 
-        return processed_frame
+    def _read_latest(self, max_frames: int = 5, fresh_threshold: float = 0.005) -> tuple[bool, np.ndarray | None]:
+        """
+        Read the newest frame, discarding frames that were queued by the driver before this call.
+
+        Buffered frames are returned almost instantly, so grabbing stops as soon as a grab
+        has to wait for the camera, or after max_frames grabs.
+
+        Args:
+            max_frames: Maximum number of frames to grab
+            fresh_threshold: Grab duration in seconds above which the frame is considered live
+
+        Returns:
+            The same (ret, frame) pair as cv2.VideoCapture.read
+        """
+        for _ in range(max_frames):
+            start = time.perf_counter()
+            if not self.cap.grab():
+                return False, None
+            if time.perf_counter() - start > fresh_threshold:
+                break
+        return self.cap.retrieve(self._raw_frame)
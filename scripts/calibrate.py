@@ -21,24 +21,71 @@ import argparse
 import threading
 import time
 import signal
-import select
 import sys
 import yaml
-import json
 import logging
 
-from draccus import parse
-from lerobot.robots.so101_follower.config_so101_follower import SO101FollowerConfig
-from lerobot.teleoperators.so101_leader.config_so101_leader import SO101LeaderConfig
-from lerobot.robots import make_robot_from_config
-from lerobot.teleoperators import make_teleoperator_from_config
+import numpy as np
 
-from leopenpi import EnvironmentConfiguration
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to the NumPy implementation
+    njit = None
+from leopenpi import EnvironmentConfiguration, LoopTimer, SafeDumper, config_to_dict, dumps_config_json, parse_config, write_config_atomic
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
 
+class _DuplicateFilter(logging.Filter):
+    """Drop records that repeat the previous message within `interval` seconds."""
+
+    def __init__(self, interval: float = 1.0):
+        super().__init__()
+        self.interval = interval
+        self._last_message = None
+        self._last_time = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        if message == self._last_message and record.created - self._last_time < self.interval:
+            return False
+        self._last_message = message
+        self._last_time = record.created
+        return True
+
+
+# The teleoperation loop logs through its own handler so device hiccups at 60 Hz
+# don't flood the console or go through the root logger
+teleop_logger = logging.getLogger(f"{__name__}.teleop")
+teleop_logger.propagate = False
+_teleop_handler = logging.StreamHandler()
+_teleop_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+_teleop_handler.addFilter(_DuplicateFilter())
+teleop_logger.addHandler(_teleop_handler)
+
+
+def _update_limits_numpy(min_limits: np.ndarray, max_limits: np.ndarray, positions: np.ndarray):
+    """Widen the limits in place to include every row of `positions`. NaN values are ignored."""
+    np.fmin(min_limits, np.fmin.reduce(positions, axis=0), out=min_limits)
+    np.fmax(max_limits, np.fmax.reduce(positions, axis=0), out=max_limits)
+
+
+def _update_limits_loop(min_limits: np.ndarray, max_limits: np.ndarray, positions: np.ndarray):
+    """Single-pass version of `_update_limits_numpy`, for compilation with numba."""
+    for row in range(positions.shape[0]):
+        for i in range(positions.shape[1]):
+            value = positions[row, i]
+            # Comparisons with NaN are False, so missing joints are ignored
+            if value < min_limits[i]:
+                min_limits[i] = value
+            if value > max_limits[i]:
+                max_limits[i] = value
+
+
+_update_limits_kernel = njit(cache=True)(_update_limits_loop) if njit is not None else _update_limits_numpy
+
+
 class JointLimitsCalibrator:
     """
     Interactive joint limits calibration tool.
@@ -49,22 +96,46 @@ class JointLimitsCalibrator:
     def __init__(self, config: EnvironmentConfiguration):
         self.config = config
 
-        # Reset limits
-        for joint in config.robot.joints:
-            joint.min_limit = 0
-            joint.max_limit = 0
-        self.config.robot.gripper.min_limit = 0
-        self.config.robot.gripper.max_limit = 0
+        # Limits are reset and tracked as arrays during teleoperation, then written back
+        # to the joint configurations once calibration finishes (see `_apply_limits`)
+        self._joint_configs = tuple(config.robot.all_joints)
+        self._joint_keys = tuple(sys.intern(f"{joint.name}.pos") for joint in self._joint_configs)
+        self._missing_values = (np.nan,) * len(self._joint_keys)
+        self._min_limits = np.zeros(len(self._joint_keys), dtype=np.float64)
+        self._max_limits = np.zeros(len(self._joint_keys), dtype=np.float64)
+        # The status text is formatted from a single template built once per joint layout
+        self._status_template = "\n".join(
+            ["Current Joint Positions and Limits:", "-" * 50] + [
+                f"{joint.name:15}: {{{3 * i}:8.4f}} (limits: {{{3 * i + 1}:8.4f}} to {{{3 * i + 2}:8.4f}})"
+                for i, joint in enumerate(config.robot.all_joints)
+            ]
+        )
+
+        # Trigger JIT compilation now rather than on the first teleoperation step
+        _update_limits_kernel(np.zeros(1), np.zeros(1), np.zeros((1, 1)))
+
+        # Joint positions are passed from the teleop thread to the main thread through a
+        # single-producer single-consumer ring. The teleop thread only advances `_ring_head`
+        # and the main thread only advances `_ring_tail`, so no lock is needed.
+        self._ring_size = 1024  # ~17 s at 60 Hz
+        self._ring_mask = self._ring_size - 1
+        self._ring_positions = np.empty((self._ring_size, len(self._joint_keys)), dtype=np.float64)
+        self._ring_head = 0
+        self._ring_tail = 0
 
         self.robot_port = config.robot.port
         self.teleop_port = config.teleop.port
 
         self.teleop_thread = None
         self.teleop_running = False
+        # Set by the teleop thread once the devices are connected, or when it exits early
+        self._teleop_ready = threading.Event()
         self.lerobot_robot = None
         self.lerobot_teleop = None
-        self.current_observation = None
-        self.observation_lock = threading.Lock()
+        # Observations are published by the teleop thread through two slots and a sequence
+        # counter, so the status reader never blocks the control loop
+        self._obs_slots = [None, None]
+        self._obs_seq = 0
 
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -78,6 +149,12 @@ class JointLimitsCalibrator:
     def _teleoperation_loop(self):
         """Run teleoperation loop and track joint positions."""
         try:
+            # lerobot pulls in torch and the serial stack, so only import it once we actually need the devices
+            from lerobot.robots.so101_follower.config_so101_follower import SO101FollowerConfig
+            from lerobot.teleoperators.so101_leader.config_so101_leader import SO101LeaderConfig
+            from lerobot.robots import make_robot_from_config
+            from lerobot.teleoperators import make_teleoperator_from_config
+
             # Create robot configuration
             robot_config = SO101FollowerConfig(
                 port=self.robot_port,
@@ -99,39 +176,29 @@ class JointLimitsCalibrator:
             # Connect to devices
             self.lerobot_teleop.connect()
             self.lerobot_robot.connect()
+            self._teleop_ready.set()
 
             logger.info("Starting teleoperation loop...")
 
-            # Run the teleoperation loop
+            # Run the teleoperation loop on a fixed deadline so work time doesn't stretch the period.
+            # Device errors drop out of the step loop, are logged, and the loop is resumed.
+            timer = LoopTimer(hz=60)
             while self.teleop_running:
                 try:
-                    # Get action from teleoperator
-                    action = self.lerobot_teleop.get_action()
-
-                    # Get current observation from robot
-                    observation = self.lerobot_robot.get_observation()
-
-                    # Store observation and update limits
-                    with self.observation_lock:
-                        self.current_observation = observation
-                        self._update_limits(observation)
-
-                    # Send action to robot
-                    self.lerobot_robot.send_action(action)
-
-                    # Control loop timing (60 Hz)
-                    time.sleep(1.0 / 60.0)
-
+                    self._run_teleop_steps(timer)
                 except KeyboardInterrupt:
                     break
                 except Exception as e:
-                    logger.error(f"Error in teleoperation loop: {e}")
+                    teleop_logger.error("Error in teleoperation loop: %s", e)
                     time.sleep(0.1)
+                    timer.reset()
 
         except Exception as e:
-            logger.error(f"Teleoperation thread error: {e}")
+            teleop_logger.error("Teleoperation thread error: %s", e)
             self.teleop_running = False
         finally:
+            # Unblock run_* if we failed before the devices were ready
+            self._teleop_ready.set()
             # Cleanup connections
             if self.lerobot_teleop:
                 try:
@@ -144,14 +211,77 @@ class JointLimitsCalibrator:
                 except:
                     pass
 
-    def _update_limits(self, observation: dict):
-        """Update joint limits based on current observation."""
-        for joint_config in self.config.robot.all_joints:
-            joint_key = f"{joint_config.name}.pos"
-            if joint_key in observation:
-                current_pos = observation[joint_key]
-                joint_config.min_limit = min(joint_config.min_limit, current_pos)
-                joint_config.max_limit = max(joint_config.max_limit, current_pos)
+    def _run_teleop_steps(self, timer: LoopTimer):
+        """Mirror the teleoperator onto the robot until stopped. Device errors propagate to the caller."""
+        while self.teleop_running:
+            # Get action from teleoperator
+            action = self.lerobot_teleop.get_action()
+
+            # Get current observation from robot
+            observation = self.lerobot_robot.get_observation()
+
+            # Store observation and record positions for the limit update
+            self._publish_observation(observation)
+            self._record_positions(observation)
+
+            # Send action to robot
+            self.lerobot_robot.send_action(action)
+
+            # Control loop timing (60 Hz)
+            overrun = timer.sleep()
+            if overrun:
+                teleop_logger.debug("Teleoperation loop missed its deadline by %.1f ms", overrun * 1000)
+
+    def _publish_observation(self, observation: dict):
+        """Publish the latest observation. Only called from the teleoperation thread."""
+        self._obs_slots[self._obs_seq & 1] = observation
+        self._obs_seq += 1
+
+    @property
+    def current_observation(self) -> dict | None:
+        """The most recently published observation, or None if there isn't one yet."""
+        while True:
+            seq = self._obs_seq
+            if seq == 0:
+                return None
+            observation = self._obs_slots[(seq - 1) & 1]
+            # Retry if the producer wrapped around onto the slot we just read
+            if self._obs_seq - seq < 2:
+                return observation
+
+    def _record_positions(self, observation: dict):
+        """Append the observed joint positions to the ring. Only called from the teleoperation thread."""
+        slot = self._ring_head & self._ring_mask
+        # Missing joints come through as NaN, which the limit update ignores
+        self._ring_positions[slot] = np.fromiter(
+            map(observation.get, self._joint_keys, self._missing_values),
+            dtype=np.float64,
+            count=len(self._joint_keys),
+        )
+        self._ring_head += 1
+
+    def _update_limits(self):
+        """Update joint limits from the positions recorded since the last update. Only called from the main thread."""
+        head = self._ring_head
+        # If the teleop thread lapped us, the oldest unread positions are gone
+        tail = max(self._ring_tail, head - self._ring_size)
+        if head == tail:
+            return
+
+        positions = self._ring_positions[np.arange(tail, head) & self._ring_mask]
+        # Drop rows the teleop thread overwrote while they were being copied
+        overwritten = self._ring_head - self._ring_size - tail
+        if overwritten > 0:
+            positions = positions[overwritten:]
+        self._ring_tail = head
+
+        _update_limits_kernel(self._min_limits, self._max_limits, positions)
+
+    def _apply_limits(self):
+        """Write the tracked limits back to the joint configurations."""
+        for joint_config, min_limit, max_limit in zip(self._joint_configs, self._min_limits, self._max_limits):
+            joint_config.min_limit = float(min_limit)
+            joint_config.max_limit = float(max_limit)
 
     def stop_teleoperation(self):
         """Stop the teleoperation thread."""
@@ -175,23 +305,17 @@ class JointLimitsCalibrator:
 
     def get_current_status(self) -> str:
         """Get current joint positions and limits as a formatted string."""
-        with self.observation_lock:
-            if self.current_observation is None:
-                return "No observation data available"
+        observation = self.current_observation
+        if observation is None:
+            return "No observation data available"
 
-            status_lines = ["Current Joint Positions and Limits:", "-" * 50]
+        self._update_limits()
 
-            # Collect status
-            for joint in self.config.robot.all_joints:
-                key = f"{joint.name}.pos"
-
-                if key in self.current_observation:
-                    current_pos = self.current_observation[key]
-                    status_lines.append(
-                        f"{joint.name:15}: {current_pos:8.4f} "
-                        f"(limits: {joint.min_limit:8.4f} to {joint.max_limit:8.4f})"
-                    )
-            return "\n".join(status_lines)
+        # Joints missing from the observation are shown as nan
+        values = []
+        for i, key in enumerate(self._joint_keys):
+            values += (observation.get(key, np.nan), self._min_limits[i], self._max_limits[i])
+        return self._status_template.format(*values)
 
     def run_calibration(self):
         """Run the calibration process."""
@@ -204,79 +328,81 @@ class JointLimitsCalibrator:
 
         self.teleop_running = True
         self.teleop_thread = threading.Thread(target=self._teleoperation_loop, daemon=True)
+        self._teleop_ready.clear()
         self.teleop_thread.start()
 
+        # Wait for the devices to connect. This can take a while if lerobot asks for motor calibration.
+        while not self._teleop_ready.wait(10.0):
+            logger.info("Waiting for robot and teleoperator to connect...")
 
         if not self.teleop_running:
             raise RuntimeError("Failed to start teleoperation")
 
         logger.info("Teleoperation started successfully")
 
+        # Wait for ENTER on a separate thread so the status display doesn't have to poll stdin
+        stop_requested = threading.Event()
+
+        def wait_for_enter():
+            sys.stdin.readline()
+            stop_requested.set()
+
+        threading.Thread(target=wait_for_enter, daemon=True).start()
+
         try:
-            print("Press ENTER to stop calibration...")
-            while True:
+            print("\033[2J", end="")  # Clear screen once, then redraw in place
+            status_interval = 0.25
+            next_status = time.perf_counter()
+            while not stop_requested.is_set():
                 try:
-                    print("\r" + " " * 80 + "\r", end="")  # Clear line
-                    print(self.get_current_status())
-                    print("\nPress ENTER to stop calibration...")
-                    if sys.stdin in select.select([sys.stdin], [], [], 0.1)[0]:
-                        input()  # Consume the input
-                        break
-
-                    time.sleep(0.1)
+                    # Move the cursor home and clear below instead of scrolling the terminal
+                    print("\033[H\033[J" + self.get_current_status())
+                    print("\nPress ENTER to stop calibration...", flush=True)
+                    # Wake on the status deadline (monotonic) or as soon as ENTER is pressed
+                    next_status += status_interval
+                    stop_requested.wait(max(0.0, next_status - time.perf_counter()))
 
                 except KeyboardInterrupt:
                     break
-                except Exception as e:
-                    raise e
 
         finally:
             self.stop_teleoperation()
+            self._update_limits()
+            self._apply_limits()
 
         print("\n" + "=" * 60)
         print("CALIBRATION COMPLETE!")
         print("=" * 60)
 
-    def _config_to_dict(self, obj):
-        """Recursively convert configuration objects to dictionaries."""
-        if hasattr(obj, '__dict__'):
-            result = {}
-            for key, value in obj.__dict__.items():
-                if key == 'logger':  # Skip logger objects
-                    continue
-                result[key] = self._config_to_dict(value)
-            return result
-        elif isinstance(obj, list):
-            return [self._config_to_dict(item) for item in obj]
-        else:
-            return obj
-
     def save_config(self, path: str):
+        """Save the configuration atomically, so a failed write never replaces the original."""
+        if not path.endswith(('.yaml', '.yml', '.json')):
+            raise ValueError("Config file must be either YAML or JSON.")
+
         # Convert config to dict for serialization
-        config_dict = self._config_to_dict(self.config)
+        config_dict = config_to_dict(self.config)
 
         # Reorder keys to put 'robot' last
         if 'robot' in config_dict:
             ordered_dict = {k: v for k, v in sorted(config_dict.items()) if k != 'robot'}
             ordered_dict['robot'] = config_dict['robot']
+            config_dict = ordered_dict
 
-            # This should be computed on the fly
-            del ordered_dict['robot']['all_joints']
+        write_config_atomic(path, config_dict)
+        print(f"Updated configuration saved to: {path}")
 
-            config_dict = ordered_dict
+    def print_config_formats(self):
+        """Print the updated configuration in JSON and YAML formats.
 
-        with open(path, 'w') as f:
-            if path.endswith('.yaml') or path.endswith('.yml'):
-                yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False)
-            elif path.endswith('.json'):
-                json.dump(config_dict, f, indent=2)
-            else:
-                raise ValueError("Config file must be either YAML or JSON.")
-            print(f"Updated configuration saved to: {path}")
+        When stdout is not a terminal only the JSON is printed, so the output can be piped
+        into other tools without paying for a YAML dump nobody reads.
+        """
+        config_dict = config_to_dict(self.config)
 
+        if not sys.stdout.isatty():
+            print(dumps_config_json(config_dict))
+            return
 
-    def print_config_formats(self):
-        """Print the updated configuration in both JSON and YAML formats."""
         print("\n" + "=" * 60)
         print("UPDATED CONFIGURATION")
         print("=" * 60)
@@ -284,14 +410,14 @@ class JointLimitsCalibrator:
         # Print JSON format
         print("\nJSON Format:")
         print("-" * 20)
-        print(json.dumps(self.config, indent=2))
+        print(dumps_config_json(config_dict))
 
         print("\n")
 
         # Print YAML format
         print("YAML Format:")
         print("-" * 20)
-        print(yaml.dump(self.config, default_flow_style=False, sort_keys=False))
+        print(yaml.dump(config_dict, Dumper=SafeDumper, default_flow_style=False, sort_keys=False))
 
     def cleanup(self):
         """Clean up resources."""
@@ -299,7 +425,7 @@ class JointLimitsCalibrator:
 
 
 def main():
-    config = parse(EnvironmentConfiguration)
+    config = parse_config(EnvironmentConfiguration)
     argparser = argparse.ArgumentParser()
     argparser.add_argument("--config_path")
     args = argparser.parse_args()
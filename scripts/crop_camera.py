@@ -18,14 +18,12 @@ The script will:
 """
 import argparse
 import sys
-import yaml
-import json
 import cv2
 import logging
+import numpy as np
 
-from draccus import parse
 
-from leopenpi import EnvironmentConfiguration
+from leopenpi import EnvironmentConfiguration, config_to_dict, parse_config, write_config_atomic
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -45,6 +43,8 @@ class CameraCropCalibrator:
         self.drawing = False
         self.current_frame = None
         self.display_frame = None
+        # Packed bounding box currently drawn on display_frame (-1 if nothing drawn yet), used to skip redundant redraws
+        self._drawn_bbox = -1
 
     def mouse_callback(self, event, x, y, flags, param):
         """Mouse callback for drawing bounding box."""
@@ -61,12 +61,26 @@ class CameraCropCalibrator:
             self.drawing = False
             self.bbox_end = (x, y)
 
-    def update_display(self):
-        """Update the display with the current bounding box."""
+    def _packed_bbox(self) -> int:
+        """Pack the bounding box corners into one int (16 bits per coordinate) for cheap change checks."""
+        if not (self.bbox_start and self.bbox_end):
+            return -2
+        # Mask each coordinate, since dragging outside the window can report negative positions
+        (x0, y0), (x1, y1) = self.bbox_start, self.bbox_end
+        return ((x0 & 0xFFFF) << 48) | ((y0 & 0xFFFF) << 32) | ((x1 & 0xFFFF) << 16) | (y1 & 0xFFFF)
+
+    def update_display(self) -> bool:
+        """Update the display with the current bounding box. Returns whether the display changed."""
         if self.current_frame is None:
-            return
+            return False
+
+        bbox = self._packed_bbox()
+        if bbox == self._drawn_bbox:
+            return False
+        self._drawn_bbox = bbox
 
-        self.display_frame = self.current_frame.copy()
+        # Redraw into the reusable display buffer instead of allocating a copy every tick
+        np.copyto(self.display_frame, self.current_frame)
 
         if self.bbox_start and self.bbox_end:
             cv2.rectangle(
@@ -93,31 +107,19 @@ class CameraCropCalibrator:
                 (0, 255, 0),
                 2
             )
+        return True
 
-    def show_cropped_preview(self, camera_config, minX, maxX, minY, maxY):
+    def show_cropped_preview(self, camera_config, cap, minX, maxX, minY, maxY):
         """Show a preview of the cropped image and ask for confirmation."""
-        # Open camera again
-        cap = cv2.VideoCapture(camera_config.index)
-        if not cap.isOpened():
-            logger.error(f"Failed to open camera {camera_config.index}")
-            return False
-
-        # Capture a frame
+        # Capture a fresh frame from the already open camera
         ret, frame = cap.read()
-        cap.release()
 
         if not ret:
             logger.error(f"Failed to capture frame from camera {camera_config.index}")
             return False
 
-        # Convert to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Apply the crop using all 4 coordinates
-        cropped = frame_rgb[minY:maxY, minX:maxX]
-
-        # Convert back to BGR for display
-        cropped_bgr = cv2.cvtColor(cropped, cv2.COLOR_RGB2BGR)
+        # Apply the crop using all 4 coordinates. OpenCV displays BGR, so no conversion is needed.
+        cropped_bgr = frame[minY:maxY, minX:maxX]
 
         # Create preview window
         preview_window = f"Cropped Preview - {camera_config.name}"
@@ -129,9 +131,11 @@ class CameraCropCalibrator:
         print("  - Press 'r' to RE-CROP (go back to drawing)")
         print("  - Press 'q' to SKIP this camera (don't save)")
 
+        # The preview is static, so it only needs to be shown once
+        cv2.imshow(preview_window, cropped_bgr)
         while True:
-            cv2.imshow(preview_window, cropped_bgr)
-            key = cv2.waitKey(1) & 0xFF
+            # ~60 Hz key polling is plenty for this UI and avoids spinning the GUI thread
+            key = cv2.waitKey(15) & 0xFF
 
             if key == ord('s'):
                 # Confirm save
@@ -150,24 +154,37 @@ class CameraCropCalibrator:
         """Calibrate crop region for a single camera."""
         logger.info(f"Calibrating camera: {camera_config.name} (index: {camera_config.index})")
 
-        while True:  # Loop to allow re-cropping
-            # Open camera
+        # Open the camera once and keep it open for drawing, previews and re-crops
+        if sys.platform.startswith('linux'):
+            # Use V4L2 directly and request MJPG, which needs far less USB bandwidth than raw YUYV
+            cap = cv2.VideoCapture(camera_config.index, cv2.CAP_V4L2)
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        else:
             cap = cv2.VideoCapture(camera_config.index)
-            if not cap.isOpened():
-                logger.error(f"Failed to open camera {camera_config.index}")
-                return False
+        if not cap.isOpened():
+            logger.error(f"Failed to open camera {camera_config.index}")
+            return False
+        # Only keep the newest frame queued so each read is current
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
+        try:
+            return self._calibrate_with_capture(camera_config, cap)
+        finally:
+            cap.release()
+
+    def _calibrate_with_capture(self, camera_config, cap):
+        """Run the crop drawing and preview loop using an open camera."""
+        while True:  # Loop to allow re-cropping
             # Capture a frame
             ret, frame = cap.read()
             if not ret:
                 logger.error(f"Failed to capture frame from camera {camera_config.index}")
-                cap.release()
                 return False
 
-            # Convert to RGB for display
-            self.current_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.current_frame = cv2.cvtColor(self.current_frame, cv2.COLOR_RGB2BGR)
-            self.display_frame = self.current_frame.copy()
+            # OpenCV displays BGR, so the frame is shown as captured
+            self.current_frame = frame
+            self.display_frame = np.empty_like(self.current_frame)
+            self._drawn_bbox = -1
 
             # Reset bounding box
             self.bbox_start = None
@@ -189,10 +206,12 @@ class CameraCropCalibrator:
             crop_drawn = False
 
             while True:
-                self.update_display()
-                cv2.imshow(window_name, self.display_frame)
+                # The window keeps showing the last image, so only push a new one when it changed
+                if self.update_display():
+                    cv2.imshow(window_name, self.display_frame)
 
-                key = cv2.waitKey(1) & 0xFF
+                # ~60 Hz key polling is plenty for this UI and avoids spinning the GUI thread
+                key = cv2.waitKey(15) & 0xFF
 
                 if key == 13:  # Enter key
                     # Preview crop
@@ -203,11 +222,10 @@ class CameraCropCalibrator:
                         maxY = max(self.bbox_start[1], self.bbox_end[1])
 
                         # Close current window
-                        cap.release()
                         cv2.destroyWindow(window_name)
 
                         # Show preview and get user decision
-                        decision = self.show_cropped_preview(camera_config, minX, maxX, minY, maxY)
+                        decision = self.show_cropped_preview(camera_config, cap, minX, maxX, minY, maxY)
 
                         if decision == 'save':
                             # Store all 4 crop coordinates
@@ -236,7 +254,6 @@ class CameraCropCalibrator:
 
                 elif key == ord('q'):
                     logger.info("Skipped camera")
-                    cap.release()
                     cv2.destroyWindow(window_name)
                     return True
 
@@ -267,24 +284,10 @@ class CameraCropCalibrator:
 
         return True
 
-    def _config_to_dict(self, obj):
-        """Recursively convert configuration objects to dictionaries."""
-        if hasattr(obj, '__dict__'):
-            result = {}
-            for key, value in obj.__dict__.items():
-                if key == 'logger':  # Skip logger objects
-                    continue
-                result[key] = self._config_to_dict(value)
-            return result
-        elif isinstance(obj, list):
-            return [self._config_to_dict(item) for item in obj]
-        else:
-            return obj
-
     def save_config(self, path: str):
         """Save the updated configuration to a file."""
         # Convert config to dict for serialization
-        config_dict = self._config_to_dict(self.config)
+        config_dict = config_to_dict(self.config)
 
         # Reorder keys to put 'cameras' and 'robot' at the bottom
         ordered_dict = {}
@@ -296,28 +299,18 @@ class CameraCropCalibrator:
 
         # Add robot section if it exists (second to last)
         if 'robot' in config_dict:
-            robot_dict = config_dict['robot']
-            # Remove computed properties
-            if 'all_joints' in robot_dict:
-                del robot_dict['all_joints']
-            ordered_dict['robot'] = robot_dict
+            ordered_dict['robot'] = config_dict['robot']
 
         # Add cameras section last
         if 'cameras' in config_dict:
             ordered_dict['cameras'] = config_dict['cameras']
 
-        with open(path, 'w') as f:
-            if path.endswith('.yaml') or path.endswith('.yml'):
-                yaml.dump(ordered_dict, f, default_flow_style=False, sort_keys=False)
-            elif path.endswith('.json'):
-                json.dump(ordered_dict, f, indent=2)
-            else:
-                raise ValueError("Config file must be YAML or JSON.")
-            logger.info(f"Updated configuration saved to: {path}")
+        write_config_atomic(path, ordered_dict)
+        logger.info(f"Updated configuration saved to: {path}")
 
 
 def main():
-    config = parse(EnvironmentConfiguration)
+    config = parse_config(EnvironmentConfiguration)
     argparser = argparse.ArgumentParser()
     argparser.add_argument("--config_path", help="Path to save the updated config file")
     args = argparser.parse_args()
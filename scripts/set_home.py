@@ -18,23 +18,21 @@ The script will:
 3. Save the position as home when you press ENTER
 """
 import argparse
+import contextlib
+import queue
 import threading
 import time
 import signal
-import select
 import sys
-import yaml
-import json
 import logging
 from pathlib import Path
-from draccus import parse
 
 from lerobot.robots.so101_follower.config_so101_follower import SO101FollowerConfig
 from lerobot.teleoperators.so101_leader.config_so101_leader import SO101LeaderConfig
 from lerobot.robots import make_robot_from_config
 from lerobot.teleoperators import make_teleoperator_from_config
 
-from leopenpi import EnvironmentConfiguration
+from leopenpi import EnvironmentConfiguration, LoopTimer, load_config_file, parse_config, write_config_atomic
 
 # Keep project_root for config file resolution
 project_root = Path(__file__).parent.parent
@@ -56,12 +54,24 @@ class HomePositionSetter:
         self.robot_port = config.robot.port
         self.teleop_port = config.teleop.port
 
+        # Status line format and (joint name, observation key) pairs, built once
+        self._status_template = "{:15}: {:8.4f}"
+        self._status_joints = [(joint.name, f"{joint.name}.pos") for joint in config.robot.all_joints]
+
         self.teleop_thread = None
-        self.teleop_running = False
+        # Set to stop the teleop threads. Cleared while teleoperation is running.
+        self._stop = threading.Event()
+        self._stop.set()
+        # Latest leader action, handed from the leader thread to the follower (teleop) thread.
+        # Reading the leader and driving the follower on separate threads overlaps their USB round-trips.
+        self._action_q = queue.Queue(maxsize=1)
+        # Set by the teleop thread once the devices are connected, or when it exits early
+        self._teleop_ready = threading.Event()
         self.lerobot_robot = None
         self.lerobot_teleop = None
+        # Written only by the teleop thread. Replacing the reference is atomic, so readers
+        # take a local snapshot instead of locking.
         self.current_observation = None
-        self.observation_lock = threading.Lock()
 
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -69,115 +79,129 @@ class HomePositionSetter:
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully."""
         logger.info("Received shutdown signal, cleaning up...")
-        self.cleanup()
-        sys.exit(0)
+        # Stop the teleop threads right away; unwinding the main thread runs stop_teleoperation,
+        # which waits for the devices to be disconnected
+        self._stop.set()
+        raise KeyboardInterrupt
 
-    def _teleoperation_loop(self):
-        """Run teleoperation loop and track current positions."""
+    @staticmethod
+    def _disconnect(device):
         try:
-            # Create robot configuration
-            robot_config = SO101FollowerConfig(
-                port=self.robot_port,
-                id=self.config.robot.id
-            )
-
-            # Create teleoperator configuration
-            teleop_config = SO101LeaderConfig(
-                port=self.teleop_port,
-                id=self.config.teleop.id
-            )
-
-            logger.info("Creating robot and teleoperator...")
-
-            # Create robot and teleoperator objects
-            self.lerobot_robot = make_robot_from_config(robot_config)
-            self.lerobot_teleop = make_teleoperator_from_config(teleop_config)
-
-            # Connect to devices
-            self.lerobot_teleop.connect()
-            self.lerobot_robot.connect()
-
-            logger.info("Starting teleoperation loop...")
-
-            # Run the teleoperation loop
-            while self.teleop_running:
-                try:
-                    # Get action from teleoperator
-                    action = self.lerobot_teleop.get_action()
-
-                    # Get current observation from robot
-                    observation = self.lerobot_robot.get_observation()
+            device.disconnect()
+        except Exception as e:
+            logger.error(f"Error disconnecting {device}: {e}")
 
-                    # Store observation
-                    with self.observation_lock:
+    def _teleoperation_loop(self):
+        """Run teleoperation loop and track current positions."""
+        # Cleanup runs in reverse order of registration: the leader thread is joined before
+        # the devices it reads from are disconnected
+        with contextlib.ExitStack() as stack:
+            # Unblock run_* if we failed before the devices were ready
+            stack.callback(self._teleop_ready.set)
+            try:
+                # Create robot configuration
+                robot_config = SO101FollowerConfig(
+                    port=self.robot_port,
+                    id=self.config.robot.id
+                )
+
+                # Create teleoperator configuration
+                teleop_config = SO101LeaderConfig(
+                    port=self.teleop_port,
+                    id=self.config.teleop.id
+                )
+
+                logger.info("Creating robot and teleoperator...")
+
+                # Create robot and teleoperator objects
+                self.lerobot_robot = make_robot_from_config(robot_config)
+                self.lerobot_teleop = make_teleoperator_from_config(teleop_config)
+
+                # Connect to devices
+                self.lerobot_teleop.connect()
+                stack.callback(self._disconnect, self.lerobot_teleop)
+                self.lerobot_robot.connect()
+                stack.callback(self._disconnect, self.lerobot_robot)
+                self._teleop_ready.set()
+
+                logger.info("Starting teleoperation loop...")
+
+                leader_thread = threading.Thread(target=self._leader_loop, daemon=True)
+                leader_thread.start()
+                stack.callback(leader_thread.join)
+                # Registered last so it runs first, whichever way the loop exits
+                stack.callback(self._stop.set)
+
+                # The loop runs at the leader's rate: each iteration waits for its next action
+                while not self._stop.is_set():
+                    try:
+                        try:
+                            action = self._action_q.get(timeout=0.1)
+                        except queue.Empty:
+                            continue
+
+                        # Get current observation from robot
+                        observation = self.lerobot_robot.get_observation()
+
+                        # Publish observation
                         self.current_observation = observation
 
-                    # Send action to robot
-                    self.lerobot_robot.send_action(action)
+                        # Send action to robot
+                        self.lerobot_robot.send_action(action)
 
-                    # Control loop timing (60 Hz)
-                    time.sleep(1.0 / 60.0)
+                    except Exception as e:
+                        logger.error(f"Error in teleoperation loop: {e}")
+                        self._stop.wait(0.1)
 
-                except KeyboardInterrupt:
-                    break
-                except Exception as e:
-                    logger.error(f"Error in teleoperation loop: {e}")
-                    time.sleep(0.1)
+            except Exception as e:
+                logger.error(f"Teleoperation thread error: {e}")
+                self._stop.set()
+
+    def _leader_loop(self):
+        """Read the teleoperator at 60 Hz and publish the latest action to the follower thread."""
+        # Run on a fixed deadline so USB round-trips don't stretch the period
+        timer = LoopTimer(hz=60)
+        while not self._stop.is_set():
+            try:
+                action = self.lerobot_teleop.get_action()
 
-        except Exception as e:
-            logger.error(f"Teleoperation thread error: {e}")
-            self.teleop_running = False
-        finally:
-            # Cleanup connections
-            if self.lerobot_teleop:
-                try:
-                    self.lerobot_teleop.disconnect()
-                except:
-                    pass
-            if self.lerobot_robot:
+                # Replace any action the follower hasn't picked up yet; only the newest matters
                 try:
-                    self.lerobot_robot.disconnect()
-                except:
+                    self._action_q.get_nowait()
+                except queue.Empty:
                     pass
+                self._action_q.put_nowait(action)
 
-    def stop_teleoperation(self):
-        """Stop the teleoperation thread."""
-        if self.teleop_running:
-            try:
-                logger.info("Stopping teleoperation...")
-                self.teleop_running = False
-
-                # Wait for thread to finish
-                if self.teleop_thread and self.teleop_thread.is_alive():
-                    self.teleop_thread.join(timeout=5.0)
-
-                logger.info("Teleoperation stopped")
+                timer.sleep()
 
             except Exception as e:
-                logger.error(f"Error stopping teleoperation: {e}")
+                logger.error(f"Error reading teleoperator: {e}")
+                self._stop.wait(0.1)
+                timer.reset()
 
-            finally:
-                self.teleop_thread = None
-                self.teleop_running = False
+    def stop_teleoperation(self):
+        """Stop the teleoperation thread and wait for the devices to be disconnected."""
+        self._stop.set()
+        if self.teleop_thread is None:
+            return
+
+        logger.info("Stopping teleoperation...")
+        if self.teleop_thread.is_alive():
+            self.teleop_thread.join(timeout=5.0)
+        self.teleop_thread = None
+        logger.info("Teleoperation stopped")
 
     def get_current_status(self) -> str:
         """Get current joint positions as a formatted string."""
-        with self.observation_lock:
-            if self.current_observation is None:
-                return "No observation data available"
+        observation = self.current_observation
+        if observation is None:
+            return "No observation data available"
 
-            status_lines = ["Current Joint Positions:", "-" * 50]
-
-            # Collect status for all joints
-            for joint in self.config.robot.all_joints:
-                key = f"{joint.name}.pos"
-
-                if key in self.current_observation:
-                    current_pos = self.current_observation[key]
-                    status_lines.append(
-                        f"{joint.name:15}: {current_pos:8.4f}"
-                    )
-            return "\n".join(status_lines)
+        # Collect status for all joints
+        fmt = self._status_template.format
+        status_lines = ["Current Joint Positions:", "-" * 50]
+        status_lines += [fmt(name, observation[key]) for name, key in self._status_joints if key in observation]
+        return "\n".join(status_lines)
 
     def run_home_setting(self):
         """Run the home position setting process."""
@@ -194,33 +218,49 @@ class HomePositionSetter:
 
         logger.info("Starting teleoperation...")
 
-        self.teleop_running = True
+        self._stop.clear()
         self.teleop_thread = threading.Thread(target=self._teleoperation_loop, daemon=True)
+        self._teleop_ready.clear()
         self.teleop_thread.start()
 
-        if not self.teleop_running:
+        # Wait for the devices to connect. This can take a while if lerobot asks for motor calibration.
+        while not self._teleop_ready.wait(10.0):
+            logger.info("Waiting for robot and teleoperator to connect...")
+
+        if self._stop.is_set():
             raise RuntimeError("Failed to start teleoperation")
 
         logger.info("Teleoperation started successfully")
 
-        try:
-            print("\nMove robot to home position using teleop device.")
-            print("Press ENTER to save the position...")
-            while True:
-                try:
-                    print("\r" + " " * 80 + "\r", end="")  # Clear line
-                    print(self.get_current_status())
-                    print("\nPress ENTER to save the position...")
-                    if sys.stdin in select.select([sys.stdin], [], [], 0.1)[0]:
-                        input()  # Consume the input
-                        break
+        # Wait for ENTER on a separate thread so the status display doesn't have to poll stdin
+        save_requested = threading.Event()
+
+        def wait_for_enter():
+            sys.stdin.readline()
+            save_requested.set()
 
-                    time.sleep(0.1)
+        threading.Thread(target=wait_for_enter, daemon=True).start()
 
-                except KeyboardInterrupt:
-                    break
-                except Exception as e:
-                    raise e
+        try:
+            print("\033[2J", end="")  # Clear screen once, then redraw in place
+            status_interval = 0.05
+            next_status = time.perf_counter()
+            prev_status = None
+            while not save_requested.is_set():
+                # Only redraw when the displayed positions actually changed
+                status = self.get_current_status()
+                if status != prev_status:
+                    prev_status = status
+                    # Move the cursor home and clear below instead of scrolling the terminal
+                    sys.stdout.write(
+                        "\033[H\033[J" + status +
+                        "\n\nMove robot to home position using teleop device.\n"
+                        "Press ENTER to save the position...\n"
+                    )
+                    sys.stdout.flush()
+                # Wake on the status deadline (monotonic) or as soon as ENTER is pressed
+                next_status += status_interval
+                save_requested.wait(max(0.0, next_status - time.perf_counter()))
 
         finally:
             self.stop_teleoperation()
@@ -231,42 +271,33 @@ class HomePositionSetter:
 
     def update_config_with_home_positions(self, config_path: str):
         """Update the config file with current robot positions as home values."""
-        with self.observation_lock:
-            if self.current_observation is None:
-                logger.error("No observation data available to save")
-                return
-
-            # Read the existing config
-            config_file = Path(config_path)
-            with open(config_file, 'r') as f:
-                if config_file.suffix.lower() == '.json':
-                    config_data = json.load(f)
-                else:
-                    config_data = yaml.safe_load(f)
-
-            # Update home positions for joints
-            for joint_config in config_data['robot']['joints']:
-                joint_name = joint_config['name']
-                joint_pos_key = f"{joint_name}.pos"
-                if joint_pos_key in self.current_observation:
-                    joint_config['home'] = float(self.current_observation[joint_pos_key])
-                    print(f"Set {joint_name} home to: {self.current_observation[joint_pos_key]:.4f}")
-
-            # Update home position for gripper
-            gripper_name = config_data['robot']['gripper']['name']
-            gripper_pos_key = f"{gripper_name}.pos"
-            if gripper_pos_key in self.current_observation:
-                config_data['robot']['gripper']['home'] = float(self.current_observation[gripper_pos_key])
-                print(f"Set {gripper_name} home to: {self.current_observation[gripper_pos_key]:.4f}")
-
-            # Write back to config file
-            with open(config_file, 'w') as f:
-                if config_file.suffix.lower() == '.json':
-                    json.dump(config_data, f, indent=2)
-                else:
-                    yaml.dump(config_data, f, default_flow_style=False, sort_keys=False)
-
-            print(f"\nSuccessfully updated home positions in {config_path}")
+        observation = self.current_observation
+        if observation is None:
+            logger.error("No observation data available to save")
+            return
+
+        # Read the existing config
+        config_data = load_config_file(config_path)
+
+        # Update home positions for joints
+        for joint_config in config_data['robot']['joints']:
+            joint_name = joint_config['name']
+            joint_pos_key = f"{joint_name}.pos"
+            if joint_pos_key in observation:
+                joint_config['home'] = float(observation[joint_pos_key])
+                print(f"Set {joint_name} home to: {observation[joint_pos_key]:.4f}")
+
+        # Update home position for gripper
+        gripper_name = config_data['robot']['gripper']['name']
+        gripper_pos_key = f"{gripper_name}.pos"
+        if gripper_pos_key in observation:
+            config_data['robot']['gripper']['home'] = float(observation[gripper_pos_key])
+            print(f"Set {gripper_name} home to: {observation[gripper_pos_key]:.4f}")
+
+        # Write back to config file without risking a truncated config if interrupted
+        write_config_atomic(config_path, config_data)
+
+        print(f"\nSuccessfully updated home positions in {config_path}")
 
     def cleanup(self):
         """Clean up resources."""
@@ -274,7 +305,7 @@ class HomePositionSetter:
 
 
 def main():
-    config = parse(EnvironmentConfiguration)
+    config = parse_config(EnvironmentConfiguration)
     argparser = argparse.ArgumentParser()
     argparser.add_argument("--config_path")
     args = argparser.parse_args()
@@ -7,10 +7,10 @@ This script guides users through setting up their robot, teleop device, cameras,
 import os
 import sys
 import subprocess
-import json
-import yaml
 from pathlib import Path
 
+from leopenpi import load_config_file, write_config_atomic, write_config_sidecar
+
 
 def get_input(prompt: str, default: str = None) -> str:
     """Get user input with optional default value."""
@@ -69,16 +69,15 @@ def save_config(config: dict, filepath: str):
     # Remove None values to avoid draccus issues
     cleaned_config = remove_none_values(config)
 
-    if path.suffix.lower() == '.json':
-        with open(path, 'w') as f:
-            json.dump(cleaned_config, f, indent=2)
-    elif path.suffix.lower() in ['.yaml', '.yml']:
-        with open(path, 'w') as f:
-            yaml.dump(cleaned_config, f, default_flow_style=False, sort_keys=False)
-    else:
+    if path.suffix.lower() not in ['.json', '.yaml', '.yml']:
         print(f"Error: Unsupported file format. Please use .json or .yaml")
         sys.exit(1)
 
+    write_config_atomic(filepath, cleaned_config)
+    if path.suffix.lower() != '.json':
+        # JSON copy that load_config_file prefers while the YAML is unchanged
+        write_config_sidecar(filepath, cleaned_config)
+
     print(f"✓ Configuration saved to {filepath}")
 
 
@@ -168,14 +167,8 @@ def main():
             run_script("crop_camera.py", "--config_path", config_path)
 
             # Reload config to get crop values
-            config_file = Path(config_path)
-            if config_file.exists():
-                if config_file.suffix.lower() == '.json':
-                    with open(config_file, 'r') as f:
-                        config = json.load(f)
-                else:
-                    with open(config_file, 'r') as f:
-                        config = yaml.safe_load(f)
+            if Path(config_path).exists():
+                config = load_config_file(config_path)
 
             # Update camera with crop values from reloaded config
             if 'cameras' in config and len(config['cameras']) > len(cameras):
@@ -211,12 +204,7 @@ def main():
     # Reload config to get calibrated joints
     config_file = Path(config_path)
     if config_file.exists():
-        if config_file.suffix.lower() == '.json':
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-        else:
-            with open(config_file, 'r') as f:
-                config = yaml.safe_load(f)
+        config = load_config_file(config_path)
 
     # Step 8: Home Position
     print_step(8, "Home Position Configuration")
@@ -226,16 +214,11 @@ def main():
 
         print("Running set home script...")
         run_script("set_home.py", "--config_path", config_path)
-        config['start_home'] = True
 
         # Reload config to get home positions
         if config_file.exists():
-            if config_file.suffix.lower() == '.json':
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-            else:
-                with open(config_file, 'r') as f:
-                    config = yaml.safe_load(f)
+            config = load_config_file(config_path)
+        config['start_home'] = True
     else:
         config['start_home'] = False
     print()